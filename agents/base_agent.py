@@ -1,82 +1,181 @@
 """
 Base Agent class with A2A (Agent-to-Agent) communication capabilities
 """
-from typing import Dict, Any, List, Optional
+from typing import ClassVar, Dict, Any, List, Optional
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
 from datetime import datetime
+import itertools
 import json
+import logging
+import sys
 
+logger = logging.getLogger(__name__)
 
+
+@dataclass(slots=True)
 class Message:
     """Message structure for A2A communication"""
-    
-    def __init__(self, sender: str, receiver: str, content: Any, msg_type: str = "request"):
-        self.sender = sender
-        self.receiver = receiver
-        self.content = content
-        self.msg_type = msg_type  # request, response, notification, query
+
+    sender: str
+    receiver: str
+    content: Any
+    msg_type: str = "request"  # request, response, notification, query
+    timestamp: str = field(init=False)
+    id: int = field(init=False)
+    _dict_cache: Optional[Dict[str, Any]] = field(init=False, default=None, repr=False)
+
+    # Monotonic, collision-free message IDs
+    _ids: ClassVar[itertools.count] = itertools.count()
+
+    def __post_init__(self):
         self.timestamp = datetime.now().isoformat()
-        self.id = f"{sender}-{receiver}-{datetime.now().timestamp()}"
-    
+        self.id = next(Message._ids)
+
     def to_dict(self) -> Dict[str, Any]:
-        return {
-            "id": self.id,
-            "sender": self.sender,
-            "receiver": self.receiver,
-            "content": self.content,
-            "type": self.msg_type,
-            "timestamp": self.timestamp
-        }
+        # Built lazily and reused: sender and receiver both append the
+        # same message to their histories.
+        if self._dict_cache is None:
+            self._dict_cache = {
+                "id": str(self.id),
+                "sender": self.sender,
+                "receiver": self.receiver,
+                "content": self.content,
+                "type": self.msg_type,
+                "timestamp": self.timestamp
+            }
+        return self._dict_cache
 
 
 class BaseAgent:
     """Base class for all agents with A2A communication"""
     
-    def __init__(self, name: str):
-        self.name = name
-        self.message_queue: List[Message] = []
+    def __init__(self, name: str, history_limit: int = 10_000):
+        self.name = sys.intern(name)
+        self.message_queue: deque = deque(maxlen=history_limit)
         self.agents_registry: Dict[str, 'BaseAgent'] = {}
-        self.conversation_history: List[Dict[str, Any]] = []
+        self.conversation_history: deque = deque(maxlen=history_limit)
+        self._subscribers: Dict[str, List['BaseAgent']] = defaultdict(list)
+        # Unhandled fire-and-forget deliveries, consumed only by
+        # drain_mailbox — kept separate from message_queue, which logs
+        # messages that were already handled on receipt
+        self.mailbox: deque = deque(maxlen=history_limit)
     
     def register_agent(self, agent: 'BaseAgent'):
         """Register another agent for A2A communication"""
         self.agents_registry[agent.name] = agent
-        print(f"[A2A] {self.name} registered {agent.name}")
+        logger.debug("[A2A] %s registered %s", self.name, agent.name)
     
     def send_message(self, receiver: str, content: Any, msg_type: str = "request") -> Optional[Any]:
         """Send a message to another agent"""
-        if receiver not in self.agents_registry:
-            print(f"[A2A] Error: {receiver} not found in registry")
+        receiver = sys.intern(receiver)
+        target_agent = self.agents_registry.get(receiver)
+        if target_agent is None:
+            logger.warning("[A2A] Error: %s not found in registry", receiver)
             return None
-        
-        message = Message(self.name, receiver, content, msg_type)
-        self.conversation_history.append(message.to_dict())
-        
-        print(f"[A2A] {self.name} → {receiver}: {msg_type}")
-        
-        # Deliver message to receiver
-        target_agent = self.agents_registry[receiver]
-        return target_agent.receive_message(message)
+        return self._deliver_local(target_agent, content, msg_type)
+
+    def _deliver_local(self, target_agent: 'BaseAgent', content: Any, msg_type: str) -> Any:
+        """Fused send+receive for in-process delivery.
+
+        Builds one Message and one dict payload shared by both histories,
+        then calls the handler directly — no second frame through
+        receive_message.
+        """
+        message = Message(self.name, target_agent.name, content, msg_type)
+        payload = message.to_dict()
+        self.conversation_history.append(payload)
+        target_agent.message_queue.append(message)
+        target_agent.conversation_history.append(payload)
+
+        logger.debug("[A2A] %s -> %s: %s", self.name, target_agent.name, msg_type)
+
+        return target_agent.handle_message(message)
     
     def receive_message(self, message: Message) -> Any:
         """Receive and process a message from another agent"""
         self.message_queue.append(message)
         self.conversation_history.append(message.to_dict())
         
-        print(f"[A2A] {self.name} ← {message.sender}: {message.msg_type}")
+        logger.debug("[A2A] %s <- %s: %s", self.name, message.sender, message.msg_type)
         
         # Process the message
         return self.handle_message(message)
     
+    def subscribe(self, topic: str, agent: 'BaseAgent'):
+        """Subscribe an agent to a topic published by this agent"""
+        self._subscribers[topic].append(agent)
+        logger.debug("[A2A] %s subscribed %s to topic '%s'", self.name, agent.name, topic)
+
+    def publish(self, topic: str, content: Any, msg_type: str = "notification") -> Dict[str, Any]:
+        """Publish one message to every subscriber of a topic.
+
+        All subscribers receive the same Message object (treated as
+        immutable), so the payload and its to_dict form are built once
+        regardless of fanout.
+        """
+        subscribers = self._subscribers.get(topic)
+        if not subscribers:
+            return {}
+
+        message = Message(self.name, topic, content, msg_type)
+        self.conversation_history.append(message.to_dict())
+        logger.debug("[A2A] %s published '%s' to %d subscriber(s)", self.name, topic, len(subscribers))
+        return {agent.name: agent.receive_message(message) for agent in subscribers}
+
+    def post_message(self, receiver: str, content: Any, msg_type: str = "notification") -> bool:
+        """Fire-and-forget delivery to another agent's mailbox.
+
+        Unlike send_message, this only enqueues — O(1), no rendezvous with
+        the receiver's handler. The receiver processes it later via
+        drain_mailbox.
+        """
+        receiver = sys.intern(receiver)
+        if receiver not in self.agents_registry:
+            logger.warning("[A2A] Error: %s not found in registry", receiver)
+            return False
+
+        message = Message(self.name, receiver, content, msg_type)
+        self.conversation_history.append(message.to_dict())
+        self.agents_registry[receiver].mailbox.append(message)
+        logger.debug("[A2A] %s -> %s (mailbox): %s", self.name, receiver, msg_type)
+        return True
+
+    def drain_mailbox(self) -> List[Any]:
+        """Handle every message waiting in this agent's mailbox"""
+        responses = []
+        while self.mailbox:
+            message = self.mailbox.popleft()
+            self.message_queue.append(message)
+            self.conversation_history.append(message.to_dict())
+            logger.debug("[A2A] %s <- %s: %s", self.name, message.sender, message.msg_type)
+            responses.append(self.handle_message(message))
+        return responses
+
     def handle_message(self, message: Message) -> Any:
         """Override this method to handle incoming messages"""
         return {"status": "received", "message": "Message received but not processed"}
     
     def broadcast(self, content: Any, msg_type: str = "notification"):
         """Broadcast a message to all registered agents"""
-        responses = {}
-        for agent_name in self.agents_registry:
-            response = self.send_message(agent_name, content, msg_type)
-            responses[agent_name] = response
+        # Deliver directly instead of going through send_message per
+        # recipient: one registry pass, one history extend at the end.
+        # Receivers often do boto3 I/O, so fan out across threads and
+        # wait for all of them — latency is max(t_i), not the sum.
+        if not self.agents_registry:
+            return {}
+
+        sent = []
+        futures = {}
+        with ThreadPoolExecutor(max_workers=len(self.agents_registry)) as executor:
+            for agent_name, target_agent in self.agents_registry.items():
+                message = Message(self.name, agent_name, content, msg_type)
+                sent.append(message.to_dict())
+                logger.debug("[A2A] %s -> %s: %s", self.name, agent_name, msg_type)
+                futures[agent_name] = executor.submit(target_agent.receive_message, message)
+            responses = {name: future.result() for name, future in futures.items()}
+        self.conversation_history.extend(sent)
         return responses
     
     def query_agent(self, agent_name: str, query: str) -> Any:
@@ -85,4 +184,14 @@ class BaseAgent:
     
     def get_conversation_history(self) -> List[Dict[str, Any]]:
         """Get the conversation history"""
-        return self.conversation_history
+        return list(self.conversation_history)
+
+    def get_recent_history(self, count: int = 5) -> List[Dict[str, Any]]:
+        """Last `count` history entries without copying the whole deque.
+
+        Walking the deque backwards costs O(count); a [-count:] slice via
+        get_conversation_history would copy every entry first.
+        """
+        recent = list(itertools.islice(reversed(self.conversation_history), count))
+        recent.reverse()
+        return recent
@@ -1,10 +1,54 @@
+import copy
 import json
+import logging
 import re
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Any
 from agents.base_agent import BaseAgent
 from agents.ec2_agent import EC2Agent
 from agents.s3_agent import S3Agent
-from agents.fast_perplexity_client import FastPerplexityClient
+from agents.fast_perplexity_client import FastPerplexityClient, ParseUnavailable
+
+logger = logging.getLogger(__name__)
+
+# Precompiled patterns for the extraction hot path
+_INSTANCE_ID_RE = re.compile(r'i-[a-f0-9]{8,17}')
+_INSTANCE_TYPE_RE = re.compile(r't[2-3]\.(micro|small|medium|large|xlarge)')
+_CREATE_TYPE_RE = re.compile(r't[2-3]\.(micro|small|medium|large)')
+_REGION_RE = re.compile(r'(us|eu|ap|ca|sa)-(east|west|south|central|north|northeast|southeast)-[1-3]')
+_S3_REGION_RE = re.compile(r'(us|eu|ap)-(east|west|south|central|northeast|southeast)-[1-3]')
+_IN_RE = re.compile(r'\bin\s+([a-z\s]+?)(?:\s|$)')
+_POLITE_RE = re.compile(r'\b(can you|could you|please|would you|can i|i want to|i need to|i would like to)\b')
+_CMD_RE = re.compile(r'(?P<svc>ec2|instance|s3|bucket)|(?P<act>create|launch|list|show|stop|terminate|delete|object|file)')
+
+# Canonical commands that never need the LLM — consulted before parse_intent
+_STATIC_INTENTS = {
+    'list instances': {'service': 'ec2', 'action': 'list_instances', 'parameters': {}},
+    'list my instances': {'service': 'ec2', 'action': 'list_instances', 'parameters': {}},
+    'show instances': {'service': 'ec2', 'action': 'list_instances', 'parameters': {}},
+    'list ec2 instances': {'service': 'ec2', 'action': 'list_instances', 'parameters': {}},
+    'list buckets': {'service': 's3', 'action': 'list_buckets', 'parameters': {}},
+    'list my buckets': {'service': 's3', 'action': 'list_buckets', 'parameters': {}},
+    'show buckets': {'service': 's3', 'action': 'list_buckets', 'parameters': {}},
+    'list s3 buckets': {'service': 's3', 'action': 'list_buckets', 'parameters': {}},
+    'help': {'service': 'unknown', 'action': 'help', 'parameters': {}},
+    'hi': {'service': 'unknown', 'action': 'greeting', 'parameters': {}},
+    'hello': {'service': 'unknown', 'action': 'greeting', 'parameters': {}},
+}
+
+# Known location names (hashed membership instead of per-keyword substring scans)
+_LOCATION_KEYWORDS = frozenset({
+    'virginia', 'ohio', 'california', 'oregon',
+    'ireland', 'london', 'paris', 'frankfurt', 'stockholm',
+    'tokyo', 'seoul', 'osaka', 'singapore', 'sydney', 'mumbai',
+    'canada', 'brazil',
+})
+_MULTIWORD_LOCATIONS = ('sao paulo',)
+_BUCKET_RES = [
+    re.compile(r'bucket\s+([a-z0-9][a-z0-9\-]{1,61}[a-z0-9])'),
+    re.compile(r'in\s+([a-z0-9][a-z0-9\-]{1,61}[a-z0-9])'),
+    re.compile(r'named?\s+([a-z0-9][a-z0-9\-]{1,61}[a-z0-9])'),
+]
 
 class CoordinatorAgent(BaseAgent):
     """Main coordinator that routes requests to specialized agents with A2A"""
@@ -14,7 +58,25 @@ class CoordinatorAgent(BaseAgent):
         self.ec2_agent = EC2Agent()
         self.s3_agent = S3Agent()
         self.perplexity = FastPerplexityClient()  # Use fast client for low latency
-        
+
+        # Caches for parsed intents and smart responses (avoid repeat LLM calls)
+        self._intent_cache: Dict[str, Dict[str, Any]] = {}
+        self._response_cache: Dict[str, str] = {}
+
+        # Action dispatch tables: one hash lookup instead of if/elif chains
+        self._ec2_handlers = {
+            'create_instance': self._ec2_create,
+            'list_instances': self._ec2_list,
+            'stop_instance': self._ec2_stop,
+            'terminate_instance': self._ec2_terminate,
+        }
+        self._s3_handlers = {
+            'create_bucket': self._s3_create,
+            'list_buckets': self._s3_list_buckets,
+            'list_objects': self._s3_list_objects,
+            'delete_bucket': self._s3_delete,
+        }
+
         # Setup A2A communication network
         self._setup_a2a_network()
     
@@ -30,15 +92,34 @@ class CoordinatorAgent(BaseAgent):
         self.s3_agent.register_agent(self)
         self.s3_agent.register_agent(self.ec2_agent)
         
-        print("[A2A] Agent network initialized: Coordinator ⟷ EC2Agent ⟷ S3Agent")
+        logger.info("[A2A] Agent network initialized: Coordinator <-> EC2Agent <-> S3Agent")
     
     def process_request(self, user_input: str) -> Dict[str, Any]:
         """Process user request and route to appropriate agent"""
         
         # Always use Perplexity AI for intent understanding
-        print(f"[Coordinator] Processing: {user_input}")
-        intent = self.perplexity.parse_intent(user_input)
-        print(f"[Coordinator] Intent: {intent}")
+        logger.debug("[Coordinator] Processing: %s", user_input)
+        cache_key = user_input.strip().lower()
+        static_intent = _STATIC_INTENTS.get(cache_key)
+        if static_intent is not None:
+            # Known command — skip the LLM round-trip entirely
+            intent = copy.deepcopy(static_intent)
+            logger.debug("[Coordinator] Static intent hit")
+        elif cache_key in self._intent_cache:
+            # Hand out a copy so handlers can't mutate the cached entry
+            intent = copy.deepcopy(self._intent_cache[cache_key])
+            logger.debug("[Coordinator] Intent cache hit")
+        else:
+            try:
+                intent = self.perplexity.parse_intent(user_input)
+            except ParseUnavailable as degraded:
+                # Keyword parse stood in for a failed LLM call: answer
+                # this turn with it but keep it out of the cache, so the
+                # next identical input retries the LLM
+                intent = degraded.fallback
+            else:
+                self._intent_cache[cache_key] = copy.deepcopy(intent)
+        logger.debug("[Coordinator] Intent: %s", intent)
         
         if intent['service'] == 'ec2':
             return self._handle_ec2_action(intent, user_input)
@@ -52,136 +133,171 @@ class CoordinatorAgent(BaseAgent):
     
     def _handle_ec2_action(self, intent: Dict[str, Any], user_input: str) -> Dict[str, Any]:
         """Handle EC2 actions based on parsed intent with A2A"""
-        action = intent['action']
-        params = intent.get('parameters', {})
-        
-        if action == 'create_instance':
-            # Get parameters from LLM parsing (no manual extraction needed!)
-            instance_type = params.get('instance_type', 't2.micro')
-            region = params.get('region')  # LLM extracts this
-            
-            # A2A: Check with S3 agent if user has buckets (for context)
-            s3_info = self.query_agent("S3Agent", "How many buckets does user have?")
-            
-            result = self.ec2_agent.create_instance(instance_type=instance_type, region=region)
-            
-            # Add helpful context if they have S3 buckets
-            if s3_info and s3_info.get('count', 0) > 0:
-                result['tip'] = f"💡 You have {s3_info['count']} S3 bucket(s). You can use them with this instance!"
-            
-            return result
-        
-        elif action == 'list_instances':
-            # Use A2A to get instance list
-            return self.send_message("EC2Agent", {"action": "list_instances"}, "request")
-        
-        elif action == 'stop_instance':
-            instance_id = params.get('instance_id') or self._extract_instance_id(user_input)
-            if instance_id:
-                return self.ec2_agent.stop_instance(instance_id)
-            return {"error": "Please provide instance ID"}
-        
-        elif action == 'terminate_instance':
-            instance_id = params.get('instance_id') or self._extract_instance_id(user_input)
-            if instance_id:
-                return self.ec2_agent.terminate_instance(instance_id)
-            return {"error": "Please provide instance ID"}
-        
-        return {"error": f"Unknown EC2 action: {action}"}
+        handler = self._ec2_handlers.get(intent['action'])
+        if handler:
+            return handler(intent.get('parameters', {}), user_input)
+        return {"error": f"Unknown EC2 action: {intent['action']}"}
+
+    def _ec2_create(self, params: Dict[str, Any], user_input: str) -> Dict[str, Any]:
+        """Create an EC2 instance with S3 context from A2A"""
+        # Get parameters from LLM parsing (no manual extraction needed!)
+        instance_type = params.get('instance_type', 't2.micro')
+        region = params.get('region')  # LLM extracts this
+
+        # A2A: Check with S3 agent if user has buckets (for context).
+        # The query is independent of the create, so run it in parallel
+        # and never let it block the main action for long.
+        executor = ThreadPoolExecutor(max_workers=1)
+        s3_future = executor.submit(
+            self.query_agent, "S3Agent", "How many buckets does user have?")
+        result = self.ec2_agent.create_instance(instance_type=instance_type, region=region)
+        try:
+            s3_info = s3_future.result(timeout=2.0)
+        except Exception:
+            s3_info = None
+        executor.shutdown(wait=False)
+
+        # Add helpful context if they have S3 buckets
+        if s3_info and s3_info.get('count', 0) > 0:
+            result['tip'] = f"💡 You have {s3_info['count']} S3 bucket(s). You can use them with this instance!"
+
+        return result
+
+    def _ec2_list(self, params: Dict[str, Any], user_input: str) -> Dict[str, Any]:
+        """List instances (direct call — topology is static, skip A2A framing)"""
+        return self.ec2_agent.list_instances()
+
+    def _ec2_stop(self, params: Dict[str, Any], user_input: str) -> Dict[str, Any]:
+        """Stop an instance by id"""
+        instance_id = params.get('instance_id') or self._extract_instance_id(user_input)
+        if instance_id:
+            return self.ec2_agent.stop_instance(instance_id)
+        return {"error": "Please provide instance ID"}
+
+    def _ec2_terminate(self, params: Dict[str, Any], user_input: str) -> Dict[str, Any]:
+        """Terminate an instance by id"""
+        instance_id = params.get('instance_id') or self._extract_instance_id(user_input)
+        if instance_id:
+            return self.ec2_agent.terminate_instance(instance_id)
+        return {"error": "Please provide instance ID"}
     
     def _handle_s3_action(self, intent: Dict[str, Any], user_input: str) -> Dict[str, Any]:
         """Handle S3 actions based on parsed intent with A2A"""
-        action = intent['action']
-        params = intent.get('parameters', {})
-        
-        if action == 'create_bucket':
-            # Get parameters from LLM parsing
-            bucket_name = params.get('bucket_name')
-            if not bucket_name:
-                return {"error": "Please provide a bucket name. Example: 'create s3 bucket my-bucket-name'"}
-            region = params.get('region')  # LLM extracts this
-            
-            # A2A: Check with EC2 agent if user has instances
-            ec2_info = self.query_agent("EC2Agent", "How many instances does user have?")
-            
-            result = self.s3_agent.create_bucket(bucket_name, region)
-            
-            # Add helpful context if they have EC2 instances
-            if ec2_info and ec2_info.get('count', 0) > 0:
-                result['tip'] = f"💡 You have {ec2_info['count']} EC2 instance(s). You can access this bucket from them!"
-            
-            return result
-        
-        elif action == 'list_buckets':
-            # Use A2A to get bucket list
-            return self.send_message("S3Agent", {"action": "list_buckets"}, "request")
-        
-        elif action == 'list_objects':
-            bucket_name = params.get('bucket_name') or self._extract_bucket_name(user_input)
-            if bucket_name:
-                return self.s3_agent.list_objects(bucket_name)
-            return {"error": "Please provide bucket name"}
-        
-        elif action == 'delete_bucket':
-            bucket_name = params.get('bucket_name') or self._extract_bucket_name(user_input)
-            if bucket_name:
-                return self.s3_agent.delete_bucket(bucket_name)
-            return {"error": "Please provide bucket name"}
-        
-        return {"error": f"Unknown S3 action: {action}"}
+        handler = self._s3_handlers.get(intent['action'])
+        if handler:
+            return handler(intent.get('parameters', {}), user_input)
+        return {"error": f"Unknown S3 action: {intent['action']}"}
+
+    def _s3_create(self, params: Dict[str, Any], user_input: str) -> Dict[str, Any]:
+        """Create an S3 bucket with EC2 context from A2A"""
+        # Get parameters from LLM parsing
+        bucket_name = params.get('bucket_name')
+        if not bucket_name:
+            return {"error": "Please provide a bucket name. Example: 'create s3 bucket my-bucket-name'"}
+        region = params.get('region')  # LLM extracts this
+
+        # A2A: Check with EC2 agent if user has instances (in parallel,
+        # same pattern as the EC2 handler)
+        executor = ThreadPoolExecutor(max_workers=1)
+        ec2_future = executor.submit(
+            self.query_agent, "EC2Agent", "How many instances does user have?")
+        result = self.s3_agent.create_bucket(bucket_name, region)
+        try:
+            ec2_info = ec2_future.result(timeout=2.0)
+        except Exception:
+            ec2_info = None
+        executor.shutdown(wait=False)
+
+        # Add helpful context if they have EC2 instances
+        if ec2_info and ec2_info.get('count', 0) > 0:
+            result['tip'] = f"💡 You have {ec2_info['count']} EC2 instance(s). You can access this bucket from them!"
+
+        return result
+
+    def _s3_list_buckets(self, params: Dict[str, Any], user_input: str) -> Dict[str, Any]:
+        """List buckets (direct call — topology is static, skip A2A framing)"""
+        return self.s3_agent.list_buckets()
+
+    def _s3_list_objects(self, params: Dict[str, Any], user_input: str) -> Dict[str, Any]:
+        """List objects in a bucket"""
+        bucket_name = params.get('bucket_name') or self._extract_bucket_name(user_input)
+        if bucket_name:
+            return self.s3_agent.list_objects(bucket_name)
+        return {"error": "Please provide bucket name"}
+
+    def _s3_delete(self, params: Dict[str, Any], user_input: str) -> Dict[str, Any]:
+        """Delete a bucket"""
+        bucket_name = params.get('bucket_name') or self._extract_bucket_name(user_input)
+        if bucket_name:
+            return self.s3_agent.delete_bucket(bucket_name)
+        return {"error": "Please provide bucket name"}
     
     def _handle_unknown(self, user_input: str, intent: Dict[str, Any] = None) -> Dict[str, Any]:
         """Handle unknown commands with AI-powered response"""
         action = intent.get('action', '') if intent else ''
-        
+
+        cache_key = user_input.strip().lower()
+        response = self._response_cache.get(cache_key)
+        if response is None:
+            response = self.perplexity.get_smart_response(user_input)
+            self._response_cache[cache_key] = response
+
         # Handle greetings and help
         if action in ['greeting', 'help']:
-            response = self.perplexity.get_smart_response(user_input)
             return {"message": response, "greeting": True}
-        
+
         # For other unknown commands, try to be helpful
-        response = self.perplexity.get_smart_response(user_input)
         return {"message": response}
     
     def _legacy_process(self, user_input: str) -> Dict[str, Any]:
         """Original processing logic as fallback"""
-        user_input_lower = user_input.lower()
-        
-        # Remove polite words to better parse intent
-        polite_words = ['can you', 'could you', 'please', 'would you', 'can i', 'i want to', 'i need to', 'i would like to']
-        for word in polite_words:
-            user_input_lower = user_input_lower.replace(word, '')
-        
+        # Remove polite words to better parse intent (single pass)
+        user_input_lower = _POLITE_RE.sub('', user_input.lower())
+
+        # One scan collects service and action keywords instead of a
+        # substring check per keyword
+        has_ec2 = has_s3 = False
+        actions = set()
+        for match in _CMD_RE.finditer(user_input_lower):
+            svc = match.group('svc')
+            if svc:
+                if svc in ('ec2', 'instance'):
+                    has_ec2 = True
+                else:
+                    has_s3 = True
+            else:
+                actions.add(match.group('act'))
+
         # EC2 Operations
-        if 'ec2' in user_input_lower or 'instance' in user_input_lower:
-            if 'create' in user_input_lower or 'launch' in user_input_lower:
-                return self._handle_ec2_create(user_input)
-            elif 'list' in user_input_lower or 'show' in user_input_lower:
+        if has_ec2:
+            if 'create' in actions or 'launch' in actions:
+                return self._handle_ec2_create(user_input, user_input_lower)
+            elif 'list' in actions or 'show' in actions:
                 return self.ec2_agent.list_instances()
-            elif 'stop' in user_input_lower:
+            elif 'stop' in actions:
                 instance_id = self._extract_instance_id(user_input)
                 if instance_id:
                     return self.ec2_agent.stop_instance(instance_id)
                 return {"error": "Please provide instance ID"}
-            elif 'terminate' in user_input_lower or 'delete' in user_input_lower:
+            elif 'terminate' in actions or 'delete' in actions:
                 instance_id = self._extract_instance_id(user_input)
                 if instance_id:
                     return self.ec2_agent.terminate_instance(instance_id)
                 return {"error": "Please provide instance ID"}
-        
+
         # S3 Operations
-        elif 's3' in user_input_lower or 'bucket' in user_input_lower:
-            if 'create' in user_input_lower:
-                return self._handle_s3_create(user_input)
-            elif 'list' in user_input_lower or 'show' in user_input_lower:
-                if 'object' in user_input_lower or 'file' in user_input_lower:
-                    bucket_name = self._extract_bucket_name(user_input)
+        elif has_s3:
+            if 'create' in actions:
+                return self._handle_s3_create(user_input, user_input_lower)
+            elif 'list' in actions or 'show' in actions:
+                if 'object' in actions or 'file' in actions:
+                    bucket_name = self._extract_bucket_name(user_input, user_input_lower)
                     if bucket_name:
                         return self.s3_agent.list_objects(bucket_name)
                     return {"error": "Please provide bucket name"}
                 return self.s3_agent.list_buckets()
-            elif 'delete' in user_input_lower:
-                bucket_name = self._extract_bucket_name(user_input)
+            elif 'delete' in actions:
+                bucket_name = self._extract_bucket_name(user_input, user_input_lower)
                 if bucket_name:
                     return self.s3_agent.delete_bucket(bucket_name)
                 return {"error": "Please provide bucket name"}
@@ -192,27 +308,31 @@ class CoordinatorAgent(BaseAgent):
                       "- S3: 'create s3 bucket <name>', 'list buckets', 'delete bucket <name>', 'list objects in <bucket>'"
         }
     
-    def _handle_ec2_create(self, user_input: str) -> Dict[str, Any]:
+    def _handle_ec2_create(self, user_input: str, user_input_lower: str = None) -> Dict[str, Any]:
         """Handle EC2 instance creation"""
+        if user_input_lower is None:
+            user_input_lower = user_input.lower()
         instance_type = "t2.micro"  # default
-        
+
         # Extract instance type if specified
-        type_match = re.search(r't[2-3]\.(micro|small|medium|large)', user_input.lower())
+        type_match = _CREATE_TYPE_RE.search(user_input_lower)
         if type_match:
             instance_type = type_match.group(0)
         
         return self.ec2_agent.create_instance(instance_type=instance_type)
     
-    def _handle_s3_create(self, user_input: str) -> Dict[str, Any]:
+    def _handle_s3_create(self, user_input: str, user_input_lower: str = None) -> Dict[str, Any]:
         """Handle S3 bucket creation"""
-        bucket_name = self._extract_bucket_name(user_input)
-        
+        if user_input_lower is None:
+            user_input_lower = user_input.lower()
+        bucket_name = self._extract_bucket_name(user_input, user_input_lower)
+
         if not bucket_name:
             return {"error": "Please provide a bucket name. Example: 'create s3 bucket my-bucket-name'"}
-        
+
         # Extract region if specified
         region = None
-        region_match = re.search(r'(us|eu|ap)-(east|west|south|central|northeast|southeast)-[1-3]', user_input.lower())
+        region_match = _S3_REGION_RE.search(user_input_lower)
         if region_match:
             region = region_match.group(0)
         
@@ -220,56 +340,51 @@ class CoordinatorAgent(BaseAgent):
     
     def _extract_instance_id(self, text: str) -> str:
         """Extract EC2 instance ID from text"""
-        match = re.search(r'i-[a-f0-9]{8,17}', text)
+        match = _INSTANCE_ID_RE.search(text)
         return match.group(0) if match else None
     
-    def _extract_bucket_name(self, text: str) -> str:
+    def _extract_bucket_name(self, text: str, text_lower: str = None) -> str:
         """Extract S3 bucket name from text"""
-        # Look for bucket name after keywords
-        patterns = [
-            r'bucket\s+([a-z0-9][a-z0-9\-]{1,61}[a-z0-9])',
-            r'in\s+([a-z0-9][a-z0-9\-]{1,61}[a-z0-9])',
-            r'named?\s+([a-z0-9][a-z0-9\-]{1,61}[a-z0-9])'
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, text.lower())
+        # Look for bucket name after keywords; callers that already
+        # lowercased the input pass it in to skip the extra pass
+        if text_lower is None:
+            text_lower = text.lower()
+        for pattern in _BUCKET_RES:
+            match = pattern.search(text_lower)
             if match:
                 return match.group(1)
-        
+
         return None
     
     def _extract_instance_type(self, text: str) -> str:
         """Extract EC2 instance type from text"""
-        type_match = re.search(r't[2-3]\.(micro|small|medium|large|xlarge)', text.lower())
+        type_match = _INSTANCE_TYPE_RE.search(text.lower())
         return type_match.group(0) if type_match else "t2.micro"
     
-    def _extract_region(self, text: str) -> str:
+    def _extract_region(self, text: str, text_lower: str = None) -> str:
         """Extract AWS region from text"""
-        text_lower = text.lower()
-        
+        if text_lower is None:
+            text_lower = text.lower()
+
         # Check for explicit region codes
-        region_match = re.search(r'(us|eu|ap|ca|sa)-(east|west|south|central|north|northeast|southeast)-[1-3]', text_lower)
+        region_match = _REGION_RE.search(text_lower)
         if region_match:
             return region_match.group(0)
         
-        # Check for location names
-        location_keywords = [
-            'virginia', 'ohio', 'california', 'oregon',
-            'ireland', 'london', 'paris', 'frankfurt', 'stockholm',
-            'tokyo', 'seoul', 'osaka', 'singapore', 'sydney', 'mumbai',
-            'canada', 'brazil', 'sao paulo'
-        ]
-        
-        for keyword in location_keywords:
-            if keyword in text_lower:
-                return keyword
-        
+        # Check for location names: multi-word first, then tokenized set lookup
+        for location in _MULTIWORD_LOCATIONS:
+            if location in text_lower:
+                return location
+
+        for token in text_lower.split():
+            if token in _LOCATION_KEYWORDS:
+                return token
+
         # Check for "in <location>" pattern
-        in_match = re.search(r'\bin\s+([a-z\s]+?)(?:\s|$)', text_lower)
+        in_match = _IN_RE.search(text_lower)
         if in_match:
             location = in_match.group(1).strip()
-            if location in location_keywords:
+            if location in _LOCATION_KEYWORDS or location in _MULTIWORD_LOCATIONS:
                 return location
         
         return None
@@ -1,31 +1,206 @@
+import logging
+import os
+import re
+import time
+import types
+
 import boto3
-from typing import Dict, Any
+from botocore.config import Config
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, Any, List, Union
 from agents.base_agent import BaseAgent, Message
 
+logger = logging.getLogger(__name__)
+
+# Shared client tuning: adaptive retries back off under throttling instead
+# of hammering, TCP keepalive holds the connection open between calls, a
+# 50-connection pool covers the cross-region fan-out, and the tight
+# connect/read timeouts keep one slow region from stalling a search
+_BOTO_CFG = Config(
+    retries={'mode': 'adaptive', 'max_attempts': 3},
+    tcp_keepalive=True,
+    max_pool_connections=50,
+    connect_timeout=2,
+    read_timeout=5,
+)
+
+# SSM public parameter for the latest Amazon Linux 2023 AMI — resolves in
+# ~20 ms with no image scan, unlike describe_images over all of 'amazon'
+_SSM_AMI_PARAM = '/aws/service/ami-amazon-linux-latest/al2023-ami-kernel-default-x86_64'
+
+# One pass over incoming A2A queries instead of a substring test per keyword
+_QUERY_RE = re.compile(r'(?P<count>instance.*?count|count.*?instance)|(?P<running>running)', re.IGNORECASE | re.DOTALL)
+
+# Location names and region codes → AWS region codes. The lookup tables
+# below are wrapped in MappingProxyType: read-only views that make any
+# accidental mutation a TypeError and let callers share them without
+# defensive copies.
+_REGION_MAP = types.MappingProxyType({
+    # US Regions
+    'virginia': 'us-east-1',
+    'n. virginia': 'us-east-1',
+    'north virginia': 'us-east-1',
+    'us-east-1': 'us-east-1',
+
+    'ohio': 'us-east-2',
+    'us-east-2': 'us-east-2',
+
+    'california': 'us-west-1',
+    'n. california': 'us-west-1',
+    'northern california': 'us-west-1',
+    'us-west-1': 'us-west-1',
+
+    'oregon': 'us-west-2',
+    'us-west-2': 'us-west-2',
+
+    # Europe Regions
+    'ireland': 'eu-west-1',
+    'eu-west-1': 'eu-west-1',
+
+    'london': 'eu-west-2',
+    'eu-west-2': 'eu-west-2',
+
+    'paris': 'eu-west-3',
+    'eu-west-3': 'eu-west-3',
+
+    'frankfurt': 'eu-central-1',
+    'eu-central-1': 'eu-central-1',
+
+    'stockholm': 'eu-north-1',
+    'eu-north-1': 'eu-north-1',
+
+    # Asia Pacific Regions
+    'tokyo': 'ap-northeast-1',
+    'ap-northeast-1': 'ap-northeast-1',
+
+    'seoul': 'ap-northeast-2',
+    'ap-northeast-2': 'ap-northeast-2',
+
+    'osaka': 'ap-northeast-3',
+    'ap-northeast-3': 'ap-northeast-3',
+
+    'singapore': 'ap-southeast-1',
+    'ap-southeast-1': 'ap-southeast-1',
+
+    'sydney': 'ap-southeast-2',
+    'ap-southeast-2': 'ap-southeast-2',
+
+    'mumbai': 'ap-south-1',
+    'ap-south-1': 'ap-south-1',
+
+    # Canada
+    'canada': 'ca-central-1',
+    'central': 'ca-central-1',
+    'ca-central-1': 'ca-central-1',
+
+    # South America
+    'sao paulo': 'sa-east-1',
+    'brazil': 'sa-east-1',
+    'sa-east-1': 'sa-east-1',
+})
+
+# Region codes → friendly names
+_REGION_NAMES = types.MappingProxyType({
+    'us-east-1': 'N. Virginia',
+    'us-east-2': 'Ohio',
+    'us-west-1': 'N. California',
+    'us-west-2': 'Oregon',
+    'eu-west-1': 'Ireland',
+    'eu-west-2': 'London',
+    'eu-west-3': 'Paris',
+    'eu-central-1': 'Frankfurt',
+    'eu-north-1': 'Stockholm',
+    'ap-northeast-1': 'Tokyo',
+    'ap-northeast-2': 'Seoul',
+    'ap-northeast-3': 'Osaka',
+    'ap-southeast-1': 'Singapore',
+    'ap-southeast-2': 'Sydney',
+    'ap-south-1': 'Mumbai',
+    'ca-central-1': 'Canada Central',
+    'sa-east-1': 'São Paulo',
+})
+_AMI_CACHE_TTL = 900  # 15 min, matching how often AMIs realistically roll
+_ami_cache: Dict[str, tuple] = {}
+
+# Last-resort AMI ids by region when SSM is unreachable
+_FALLBACK_AMIS = types.MappingProxyType({
+    'us-east-1': 'ami-0c55b159cbfafe1f0',  # Amazon Linux 2
+    'us-east-2': 'ami-0c55b159cbfafe1f0',  # Amazon Linux 2
+    'us-west-1': 'ami-0d1cd67c26f5fca19',
+    'us-west-2': 'ami-0d1cd67c26f5fca19',
+    'eu-west-1': 'ami-0d71ea30463e0ff8d',
+    'eu-west-2': 'ami-0d71ea30463e0ff8d',
+    'ap-southeast-1': 'ami-0c802847a7dd848c0'
+})
+
 class EC2Agent(BaseAgent):
     """Agent specialized in EC2 instance operations with A2A capabilities"""
-    
+
+    # Region list changes on the order of months — cache it across instances
+    _REGIONS_TTL = 24 * 3600
+    _regions_cache = None
+    _regions_expiry = 0.0
+
     def __init__(self):
         super().__init__("EC2Agent")
-        self.ec2 = boto3.client('ec2')
-        self.ec2_resource = boto3.resource('ec2')
-        self.instance_cache = {}
+        # One session shares the credential resolver; clients/resources are
+        # memoized per region because construction costs ~25 ms each
+        self._session = boto3.session.Session()
+        self._client_cache: Dict[str, Any] = {}
+        self._resource_cache: Dict[str, Any] = {}
+        self.ec2 = self._get_client()
+        self.ec2_resource = self._get_resource()
+        # instance_id -> region, so repeat operations on a known instance
+        # skip the cross-region search entirely
+        self.instance_cache: Dict[str, str] = {}
+
+    def _get_client(self, region: str = None):
+        """Memoized EC2 client for a region (default session region if None)"""
+        key = region or self._session.region_name or 'default'
+        client = self._client_cache.get(key)
+        if client is None:
+            client = self._session.client('ec2', region_name=region, config=_BOTO_CFG)
+            self._client_cache[key] = client
+        return client
+
+    def _get_resource(self, region: str = None):
+        """Memoized EC2 resource for a region"""
+        key = region or self._session.region_name or 'default'
+        resource = self._resource_cache.get(key)
+        if resource is None:
+            resource = self._session.resource('ec2', region_name=region, config=_BOTO_CFG)
+            self._resource_cache[key] = resource
+        return resource
+
+    def _get_regions(self) -> list:
+        """All available region names, cached with a 24h TTL"""
+        now = time.time()
+        if EC2Agent._regions_cache is None or now >= EC2Agent._regions_expiry:
+            response = self._get_client().describe_regions()
+            EC2Agent._regions_cache = [region['RegionName'] for region in response['Regions']]
+            EC2Agent._regions_expiry = now + self._REGIONS_TTL
+        return EC2Agent._regions_cache
     
     def handle_message(self, message: Message) -> Any:
         """Handle A2A messages from other agents"""
         content = message.content
         
         if message.msg_type == "query":
+            # Structured poll used by fire-and-forget stop/terminate callers
+            if content.get("action") == "instance_state":
+                return self._get_instance_info(content.get("instance_id"))
+
             query = content.get("query", "")
-            
-            if "instance" in query.lower() and "count" in query.lower():
+            match = _QUERY_RE.search(query)
+
+            if match and match.lastgroup == "count":
                 instances = self.list_instances()
                 count = len(instances.get("instances", []))
                 return {"count": count, "instances": instances}
-            
-            elif "running" in query.lower():
+
+            elif match and match.lastgroup == "running":
                 instances = self.list_instances()
-                running = [i for i in instances.get("instances", []) 
+                running = [i for i in instances.get("instances", [])
                           if i.get("state") == "running"]
                 return {"running_count": len(running), "instances": running}
         
@@ -43,7 +218,11 @@ class EC2Agent(BaseAgent):
     def _get_instance_info(self, instance_id: str) -> Dict[str, Any]:
         """Get detailed info about a specific instance"""
         try:
-            response = self.ec2.describe_instances(InstanceIds=[instance_id])
+            # The region cache lets polls reach instances outside the
+            # default region without a cross-region search
+            region = self.instance_cache.get(instance_id)
+            client = self._get_client(region) if region else self.ec2
+            response = client.describe_instances(InstanceIds=[instance_id])
             if response['Reservations']:
                 instance = response['Reservations'][0]['Instances'][0]
                 return {
@@ -57,7 +236,30 @@ class EC2Agent(BaseAgent):
             return {"error": str(e)}
         return {"error": "Instance not found"}
     
-    def create_instance(self, instance_type: str = "t2.micro", 
+    def _resolve_default_ami(self, region: str) -> str:
+        """Resolve the latest Amazon Linux AMI for a region.
+
+        SSM results are cached per region with a TTL; the static fallback
+        map is the last resort when SSM is unreachable.
+        """
+        cached = _ami_cache.get(region)
+        if cached and cached[1] > time.time():
+            return cached[0]
+
+        try:
+            ssm_client = self._session.client('ssm', region_name=region, config=_BOTO_CFG)
+            ami_id = ssm_client.get_parameter(Name=_SSM_AMI_PARAM)['Parameter']['Value']
+            _ami_cache[region] = (ami_id, time.time() + _AMI_CACHE_TTL)
+            return ami_id
+        except Exception:
+            return _FALLBACK_AMIS.get(region)
+
+    @staticmethod
+    def invalidate_ami_cache():
+        """Drop cached AMI ids (e.g. after a forced refresh)"""
+        _ami_cache.clear()
+
+    def create_instance(self, instance_type: str = "t2.micro",
                        ami_id: str = None, 
                        key_name: str = None,
                        tags: Dict[str, str] = None,
@@ -67,49 +269,12 @@ class EC2Agent(BaseAgent):
             # Map region name to AWS region code
             target_region = self._map_region(region) if region else "us-east-2"
             
-            # Create EC2 client for target region
-            ec2_client = boto3.client('ec2', region_name=target_region)
-            ec2_resource = boto3.resource('ec2', region_name=target_region)
+            # Reuse cached clients for target region
+            ec2_client = self._get_client(target_region)
+            ec2_resource = self._get_resource(target_region)
             # Get default AMI if not provided
             if not ami_id:
-                # Try Amazon Linux 2023 first, then fall back to Amazon Linux 2
-                ami_patterns = [
-                    'al2023-ami-*-x86_64',  # Amazon Linux 2023
-                    'amzn2-ami-hvm-*-x86_64-gp2',  # Amazon Linux 2
-                    'ubuntu/images/hvm-ssd/ubuntu-*-amd64-server-*'  # Ubuntu fallback
-                ]
-                
-                for pattern in ami_patterns:
-                    try:
-                        response = ec2_client.describe_images(
-                            Owners=['amazon'],
-                            Filters=[
-                                {'Name': 'name', 'Values': [pattern]},
-                                {'Name': 'state', 'Values': ['available']},
-                                {'Name': 'architecture', 'Values': ['x86_64']}
-                            ],
-                            MaxResults=5
-                        )
-                        if response['Images']:
-                            images = sorted(response['Images'], key=lambda x: x['CreationDate'], reverse=True)
-                            ami_id = images[0]['ImageId']
-                            break
-                    except:
-                        continue
-            
-            if not ami_id:
-                # Fallback to common AMI IDs by region
-                fallback_amis = {
-                    'us-east-1': 'ami-0c55b159cbfafe1f0',  # Amazon Linux 2
-                    'us-east-2': 'ami-0c55b159cbfafe1f0',  # Amazon Linux 2
-                    'us-west-1': 'ami-0d1cd67c26f5fca19',
-                    'us-west-2': 'ami-0d1cd67c26f5fca19',
-                    'eu-west-1': 'ami-0d71ea30463e0ff8d',
-                    'eu-west-2': 'ami-0d71ea30463e0ff8d',
-                    'ap-southeast-1': 'ami-0c802847a7dd848c0'
-                }
-                ami_id = fallback_amis.get(target_region)
-                
+                ami_id = self._resolve_default_ami(target_region)
                 if not ami_id:
                     return {"error": f"No AMI found for region {target_region}. Please specify ami_id parameter."}
             
@@ -131,9 +296,10 @@ class EC2Agent(BaseAgent):
             
             instances = ec2_resource.create_instances(**params)
             instance = instances[0]
-            
-            # Wait for instance to be running
-            instance.wait_until_running()
+
+            # Wait for instance to be running (3s poll beats the 15s default)
+            waiter = ec2_client.get_waiter('instance_running')
+            waiter.wait(InstanceIds=[instance.id], WaiterConfig={'Delay': 3, 'MaxAttempts': 40})
             instance.reload()  # Refresh instance data
             
             # Get region name for display
@@ -155,81 +321,170 @@ class EC2Agent(BaseAgent):
     def list_instances(self) -> Dict[str, Any]:
         """List all EC2 instances"""
         try:
-            response = self.ec2.describe_instances()
-            instances = []
-            for reservation in response['Reservations']:
+            # Shard the listing by availability zone so pages are fetched in
+            # parallel; fall back to one unfiltered scan if discovery fails
+            try:
+                response = self.ec2.describe_availability_zones()
+                zones = [az['ZoneName'] for az in response['AvailabilityZones']]
+            except Exception:
+                zones = []
+
+            if len(zones) > 1:
+                instances = []
+                with ThreadPoolExecutor(max_workers=5) as executor:
+                    for zone_instances in executor.map(self._collect_instances_in_zone, zones):
+                        instances.extend(zone_instances)
+            else:
+                instances = self._collect_instances_in_zone(None)
+
+            return {"success": True, "instances": instances}
+        except Exception as e:
+            return {"error": str(e)}
+
+    def _collect_instances_in_zone(self, zone: str) -> list:
+        """Paginate describe_instances, optionally filtered to one AZ"""
+        kwargs = {'PaginationConfig': {'PageSize': 1000}}
+        if zone:
+            kwargs['Filters'] = [{'Name': 'availability-zone', 'Values': [zone]}]
+
+        paginator = self.ec2.get_paginator('describe_instances')
+        instances = []
+        for page in paginator.paginate(**kwargs):
+            for reservation in page['Reservations']:
                 for instance in reservation['Instances']:
+                    # Free cache warm-up: the AZ minus its zone letter is
+                    # the region, so later stop/terminate calls skip the
+                    # cross-region search
+                    az = instance.get('Placement', {}).get('AvailabilityZone')
+                    if az:
+                        self.instance_cache[instance['InstanceId']] = az[:-1]
                     instances.append({
                         'instance_id': instance['InstanceId'],
                         'instance_type': instance['InstanceType'],
                         'state': instance['State']['Name'],
                         'launch_time': str(instance['LaunchTime'])
                     })
-            return {"success": True, "instances": instances}
-        except Exception as e:
-            return {"error": str(e)}
+        return instances
     
-    def stop_instance(self, instance_id: str) -> Dict[str, Any]:
-        """Stop an EC2 instance - searches all regions"""
+    def stop_instance(self, instance_ids: Union[str, List[str]], wait: bool = False) -> Dict[str, Any]:
+        """Stop one or more EC2 instances - searches all regions.
+
+        By default this is fire-and-forget: the stop request is issued and
+        the call returns with state 'stopping'. Pass wait=True to block
+        until every instance reports stopped.
+        """
         try:
-            # First, find which region the instance is in
-            instance_region = self._find_instance_region(instance_id)
-            
-            if not instance_region:
-                return {"error": f"Instance {instance_id} not found in any region"}
-            
-            # Create clients for the correct region
-            ec2_client = boto3.client('ec2', region_name=instance_region)
-            ec2_resource = boto3.resource('ec2', region_name=instance_region)
-            
-            # Stop the instance
-            response = ec2_client.stop_instances(InstanceIds=[instance_id])
-            
-            # Wait for instance to stop
-            instance = ec2_resource.Instance(instance_id)
-            instance.wait_until_stopped()
-            
-            region_name = self._get_region_name(instance_region)
-            
-            return {
+            single = isinstance(instance_ids, str)
+            ids = [instance_ids] if single else list(instance_ids)
+
+            # Group ids by home region so each region gets one batched call
+            regions = self._find_instance_regions(ids)
+
+            found = {iid for region_ids in regions.values() for iid in region_ids}
+            if not found:
+                return {"error": f"Instance {', '.join(ids)} not found in any region"}
+
+            for region, region_ids in regions.items():
+                ec2_client = self._get_client(region)
+                # stop_instances accepts at most 1000 ids per call
+                for start in range(0, len(region_ids), 1000):
+                    ec2_client.stop_instances(InstanceIds=region_ids[start:start + 1000])
+
+                if wait:
+                    # Wait for instances to stop (3s poll beats the 15s default)
+                    waiter = ec2_client.get_waiter('instance_stopped')
+                    waiter.wait(InstanceIds=region_ids, WaiterConfig={'Delay': 3, 'MaxAttempts': 40})
+
+            state = "stopped" if wait else "stopping"
+            verb = "stopped successfully" if wait else "is stopping"
+
+            if single:
+                instance_region = next(iter(regions))
+                region_name = self._get_region_name(instance_region)
+                return {
+                    "success": True,
+                    "instance_id": ids[0],
+                    "state": state,
+                    "region": instance_region,
+                    "region_name": region_name,
+                    "message": f"Instance {ids[0]} {verb} in {region_name} ({instance_region})"
+                }
+
+            result = {
                 "success": True,
-                "instance_id": instance_id,
-                "region": instance_region,
-                "region_name": region_name,
-                "message": f"Instance {instance_id} stopped successfully in {region_name} ({instance_region})"
+                "instance_ids": sorted(found),
+                "state": state,
+                "regions": regions,
+                "message": f"{'Stopped' if wait else 'Stopping'} {len(found)} instance(s) across {len(regions)} region(s)"
             }
+            missing = [iid for iid in ids if iid not in found]
+            if missing:
+                result["not_found"] = missing
+            return result
         except Exception as e:
             return {"error": str(e)}
-    
-    def terminate_instance(self, instance_id: str) -> Dict[str, Any]:
-        """Terminate an EC2 instance - searches all regions"""
+
+    def terminate_instance(self, instance_ids: Union[str, List[str]], wait: bool = False) -> Dict[str, Any]:
+        """Terminate one or more EC2 instances - searches all regions.
+
+        By default this is fire-and-forget: the terminate request is issued
+        and the call returns with state 'shutting-down'. Pass wait=True to
+        block until every instance reports terminated. Either way, callers
+        can poll progress with the 'instance_state' A2A query.
+        """
         try:
-            # First, find which region the instance is in
-            instance_region = self._find_instance_region(instance_id)
-            
-            if not instance_region:
-                return {"error": f"Instance {instance_id} not found in any region"}
-            
-            # Create clients for the correct region
-            ec2_client = boto3.client('ec2', region_name=instance_region)
-            ec2_resource = boto3.resource('ec2', region_name=instance_region)
-            
-            # Terminate the instance
-            response = ec2_client.terminate_instances(InstanceIds=[instance_id])
-            
-            # Wait for instance to terminate
-            instance = ec2_resource.Instance(instance_id)
-            instance.wait_until_terminated()
-            
-            region_name = self._get_region_name(instance_region)
-            
-            return {
+            single = isinstance(instance_ids, str)
+            ids = [instance_ids] if single else list(instance_ids)
+
+            # Group ids by home region so each region gets one batched call
+            regions = self._find_instance_regions(ids)
+
+            found = {iid for region_ids in regions.values() for iid in region_ids}
+            if not found:
+                return {"error": f"Instance {', '.join(ids)} not found in any region"}
+
+            for region, region_ids in regions.items():
+                ec2_client = self._get_client(region)
+                # terminate_instances accepts at most 1000 ids per call
+                for start in range(0, len(region_ids), 1000):
+                    ec2_client.terminate_instances(InstanceIds=region_ids[start:start + 1000])
+
+                if wait:
+                    # Wait for instances to terminate (3s poll beats the 15s default)
+                    waiter = ec2_client.get_waiter('instance_terminated')
+                    waiter.wait(InstanceIds=region_ids, WaiterConfig={'Delay': 3, 'MaxAttempts': 40})
+
+                # The API accepted the terminate, so these ids must not be
+                # served from the region cache again
+                for iid in region_ids:
+                    self.instance_cache.pop(iid, None)
+
+            state = "terminated" if wait else "shutting-down"
+            verb = "terminated successfully" if wait else "is shutting down"
+
+            if single:
+                instance_region = next(iter(regions))
+                region_name = self._get_region_name(instance_region)
+                return {
+                    "success": True,
+                    "instance_id": ids[0],
+                    "state": state,
+                    "region": instance_region,
+                    "region_name": region_name,
+                    "message": f"Instance {ids[0]} {verb} in {region_name} ({instance_region})"
+                }
+
+            result = {
                 "success": True,
-                "instance_id": instance_id,
-                "region": instance_region,
-                "region_name": region_name,
-                "message": f"Instance {instance_id} terminated successfully in {region_name} ({instance_region})"
+                "instance_ids": sorted(found),
+                "state": state,
+                "regions": regions,
+                "message": f"{'Terminated' if wait else 'Terminating'} {len(found)} instance(s) across {len(regions)} region(s)"
             }
+            missing = [iid for iid in ids if iid not in found]
+            if missing:
+                result["not_found"] = missing
+            return result
         except Exception as e:
             return {"error": str(e)}
     
@@ -237,119 +492,115 @@ class EC2Agent(BaseAgent):
         """Map location names or region codes to AWS region codes"""
         if not region_input:
             return "us-east-2"  # Default region
-        
-        region_lower = region_input.lower().strip()
-        
-        # Region mapping dictionary
-        region_map = {
-            # US Regions
-            'virginia': 'us-east-1',
-            'n. virginia': 'us-east-1',
-            'north virginia': 'us-east-1',
-            'us-east-1': 'us-east-1',
-            
-            'ohio': 'us-east-2',
-            'us-east-2': 'us-east-2',
-            
-            'california': 'us-west-1',
-            'n. california': 'us-west-1',
-            'northern california': 'us-west-1',
-            'us-west-1': 'us-west-1',
-            
-            'oregon': 'us-west-2',
-            'us-west-2': 'us-west-2',
-            
-            # Europe Regions
-            'ireland': 'eu-west-1',
-            'eu-west-1': 'eu-west-1',
-            
-            'london': 'eu-west-2',
-            'eu-west-2': 'eu-west-2',
-            
-            'paris': 'eu-west-3',
-            'eu-west-3': 'eu-west-3',
-            
-            'frankfurt': 'eu-central-1',
-            'eu-central-1': 'eu-central-1',
-            
-            'stockholm': 'eu-north-1',
-            'eu-north-1': 'eu-north-1',
-            
-            # Asia Pacific Regions
-            'tokyo': 'ap-northeast-1',
-            'ap-northeast-1': 'ap-northeast-1',
-            
-            'seoul': 'ap-northeast-2',
-            'ap-northeast-2': 'ap-northeast-2',
-            
-            'osaka': 'ap-northeast-3',
-            'ap-northeast-3': 'ap-northeast-3',
-            
-            'singapore': 'ap-southeast-1',
-            'ap-southeast-1': 'ap-southeast-1',
-            
-            'sydney': 'ap-southeast-2',
-            'ap-southeast-2': 'ap-southeast-2',
-            
-            'mumbai': 'ap-south-1',
-            'ap-south-1': 'ap-south-1',
-            
-            # Canada
-            'canada': 'ca-central-1',
-            'central': 'ca-central-1',
-            'ca-central-1': 'ca-central-1',
-            
-            # South America
-            'sao paulo': 'sa-east-1',
-            'brazil': 'sa-east-1',
-            'sa-east-1': 'sa-east-1',
-        }
-        
-        return region_map.get(region_lower, "us-east-2")
-    
+        return _REGION_MAP.get(region_input.casefold().strip(), "us-east-2")
+
     def _get_region_name(self, region_code: str) -> str:
         """Get friendly name for region code"""
-        region_names = {
-            'us-east-1': 'N. Virginia',
-            'us-east-2': 'Ohio',
-            'us-west-1': 'N. California',
-            'us-west-2': 'Oregon',
-            'eu-west-1': 'Ireland',
-            'eu-west-2': 'London',
-            'eu-west-3': 'Paris',
-            'eu-central-1': 'Frankfurt',
-            'eu-north-1': 'Stockholm',
-            'ap-northeast-1': 'Tokyo',
-            'ap-northeast-2': 'Seoul',
-            'ap-northeast-3': 'Osaka',
-            'ap-southeast-1': 'Singapore',
-            'ap-southeast-2': 'Sydney',
-            'ap-south-1': 'Mumbai',
-            'ca-central-1': 'Canada Central',
-            'sa-east-1': 'São Paulo',
-        }
-        return region_names.get(region_code, region_code)
+        return _REGION_NAMES.get(region_code, region_code)
     
-    def _find_instance_region(self, instance_id: str) -> str:
-        """Find which region an instance is in by checking all regions"""
-        print(f"[EC2Agent] 🔍 Searching for instance {instance_id} across all regions...")
-        
-        # Get all available regions
-        ec2_client = boto3.client('ec2')
-        regions = [region['RegionName'] for region in ec2_client.describe_regions()['Regions']]
-        
-        # Search each region
+    def _prewarm_region_clients(self, regions) -> None:
+        """Create any missing regional clients up front, on the caller's thread.
+
+        boto3 Session client creation is not thread-safe, and building a
+        client mid-fan-out puts its model-loading cost on the search's
+        critical path. After the first call this is one dict hit per region.
+        """
         for region in regions:
+            self._get_client(region)
+
+    def _find_instance_regions(self, instance_ids: List[str]) -> Dict[str, List[str]]:
+        """Group instance ids by home region with one filtered describe per region"""
+        if len(instance_ids) == 1:
+            region = self._find_instance_region(instance_ids[0])
+            return {region: list(instance_ids)} if region else {}
+
+        # Serve ids we've already located from the cache and only scan
+        # regions for the remainder
+        grouped: Dict[str, List[str]] = {}
+        remaining = set(instance_ids)
+        for iid in instance_ids:
+            cached = self.instance_cache.get(iid)
+            if cached:
+                grouped.setdefault(cached, []).append(iid)
+                remaining.discard(iid)
+        if not remaining:
+            return grouped
+        unresolved = sorted(remaining)
+
+        # Get regions to search (AWS_REGIONS env var can restrict the set)
+        regions_env = os.getenv('AWS_REGIONS')
+        if regions_env:
+            regions = [r.strip() for r in regions_env.split(',') if r.strip()]
+        else:
+            regions = self._get_regions()
+
+        self._prewarm_region_clients(regions)
+
+        def scan_region(region: str):
             try:
-                regional_client = boto3.client('ec2', region_name=region)
+                # Filter instead of InstanceIds= so ids living elsewhere
+                # don't fail the whole call with InvalidInstanceID.NotFound
+                response = self._get_client(region).describe_instances(
+                    Filters=[{'Name': 'instance-id', 'Values': unresolved}]
+                )
+                return region, [instance['InstanceId']
+                                for reservation in response['Reservations']
+                                for instance in reservation['Instances']]
+            except:
+                return region, []
+
+        with ThreadPoolExecutor(max_workers=min(16, len(regions))) as executor:
+            futures = [executor.submit(scan_region, region) for region in regions]
+            for future in as_completed(futures):
+                region, found = future.result()
+                if found:
+                    grouped.setdefault(region, []).extend(found)
+                    for iid in found:
+                        self.instance_cache[iid] = region
+                    remaining.difference_update(found)
+                    if not remaining:
+                        executor.shutdown(wait=False, cancel_futures=True)
+                        break
+        return grouped
+
+    def _find_instance_region(self, instance_id: str) -> str:
+        """Find which region an instance is in by checking all regions in parallel"""
+        cached = self.instance_cache.get(instance_id)
+        if cached:
+            return cached
+
+        logger.debug("[EC2Agent] Searching for instance %s across all regions...", instance_id)
+
+        # Get regions to search (AWS_REGIONS env var can restrict the set)
+        regions_env = os.getenv('AWS_REGIONS')
+        if regions_env:
+            regions = [r.strip() for r in regions_env.split(',') if r.strip()]
+        else:
+            regions = self._get_regions()
+
+        self._prewarm_region_clients(regions)
+
+        def check_region(region: str) -> str:
+            try:
+                regional_client = self._get_client(region)
                 response = regional_client.describe_instances(InstanceIds=[instance_id])
-                
                 if response['Reservations']:
-                    print(f"[EC2Agent] ✅ Found instance {instance_id} in {region}")
                     return region
             except:
-                # Instance not in this region, continue searching
-                continue
-        
-        print(f"[EC2Agent] ❌ Instance {instance_id} not found in any region")
+                # Instance not in this region
+                pass
+            return None
+
+        # Fan out one describe call per region; first hit wins
+        with ThreadPoolExecutor(max_workers=min(16, len(regions))) as executor:
+            futures = [executor.submit(check_region, region) for region in regions]
+            for future in as_completed(futures):
+                region = future.result()
+                if region:
+                    executor.shutdown(wait=False, cancel_futures=True)
+                    logger.debug("[EC2Agent] Found instance %s in %s", instance_id, region)
+                    self.instance_cache[instance_id] = region
+                    return region
+
+        logger.warning("[EC2Agent] Instance %s not found in any region", instance_id)
         return None
@@ -4,48 +4,60 @@ Fast Perplexity Client with async support and aggressive caching
 import os
 import asyncio
 import aiohttp
-from typing import Dict, Any, Optional
+import requests
+from requests.adapters import HTTPAdapter, Retry
+from typing import Dict, Any, List, Optional
 from dotenv import load_dotenv
 import json
+import logging
 import re
 from functools import lru_cache
 
+try:
+    import orjson
+except ImportError:  # optional C parser; stdlib json covers everything
+    orjson = None
+
 load_dotenv()
 
+logger = logging.getLogger(__name__)
 
-class FastPerplexityClient:
-    """Optimized Perplexity client for low latency"""
-    
-    def __init__(self, api_key: Optional[str] = None):
-        self.api_key = api_key or os.getenv('PERPLEXITY_API_KEY')
-        self.base_url = "https://api.perplexity.ai/chat/completions"
-        self.model = "sonar"  # Fastest model
-        
-        if self.api_key:
-            print(f"[Perplexity] ✅ Initialized with API key: {self.api_key[:10]}...")
-            print(f"[Perplexity] 🚀 Cache DISABLED - All queries go to LLM")
-        else:
-            print("[Perplexity] ❌ WARNING: No API key found! Using fallback parsing.")
-    
-    def parse_intent(self, user_input: str) -> Dict[str, Any]:
-        """Parse intent - ALWAYS call LLM (NO CACHE)"""
-        
-        # If no API key, use fast fallback
-        if not self.api_key:
-            print(f"[Perplexity] ⚠️  No API key - using fallback")
-            return self._fast_fallback(user_input)
-        
-        # ALWAYS call LLM - NO CACHING
-        print(f"[Perplexity] 🤖 Calling LLM to parse: '{user_input}'")
-        result = self._call_api_sync(user_input)
-        
-        return result
-    
-    def _call_api_sync(self, user_input: str) -> Dict[str, Any]:
-        """Synchronous API call with minimal overhead"""
-        import requests
-        
-        system_prompt = """You are a JSON-only AWS command parser. You MUST respond with ONLY valid JSON, nothing else.
+
+def _json_loads(data):
+    """Parse JSON with orjson when available, stdlib json otherwise"""
+    if orjson is not None:
+        return orjson.loads(data)
+    if isinstance(data, (bytes, bytearray)):
+        data = data.decode('utf-8')
+    return json.loads(data)
+
+# All fallback keywords in one alternation so _fast_fallback scans the
+# input once instead of probing per keyword
+_JSON_RE = re.compile(r'\{.*\}', re.DOTALL)
+
+_FALLBACK_RE = re.compile(
+    r"(?P<ec2>ec2|instance)"
+    r"|(?P<s3>s3|bucket)"
+    r"|(?P<act>create|launch|list|show|stop|terminate|delete|help)"
+)
+
+# Greetings are matched as whole tokens via set intersection — a hash
+# lookup per word instead of a substring probe per phrase, and 'this'
+# no longer reads as 'hi'
+_GREETING_TOKENS = frozenset({'hi', 'hello', 'hey', 'how', 'whats', "what's", 'up'})
+_TOKEN_RE = re.compile(r"[^a-z']+")
+
+# Micro-batching for aparse_intent: concurrent parses that arrive within
+# one window ride a single chat-completions round-trip
+_BATCH_MAX = 8
+_BATCH_WINDOW = 0.08  # seconds
+_JSON_ARRAY_RE = re.compile(r'\[.*\]', re.DOTALL)
+
+# System prompts sent verbatim on every call. Byte-identical prompt
+# prefixes let the provider reuse its server-side KV cache across
+# requests, so the prefill cost is paid once — keep variable text out of
+# these (the batch path appends its suffix AFTER the shared prefix).
+_PARSE_SYSTEM_PROMPT = """You are a JSON-only AWS command parser. You MUST respond with ONLY valid JSON, nothing else.
 
 Format (REQUIRED):
 {"service": "ec2|s3|unknown", "action": "action_name", "parameters": {}}
@@ -68,144 +80,421 @@ Examples:
 "what is aws" → {"service": "unknown", "action": "greeting", "parameters": {}}
 "create ec2 in ohio" → {"service": "ec2", "action": "create_instance", "parameters": {"region": "ohio"}}
 "list instances" → {"service": "ec2", "action": "list_instances", "parameters": {}}"""
-        
-        print(f"[Perplexity] 📡 Making API request to Perplexity...")
-        
+
+class ParseUnavailable(Exception):
+    """No trustworthy LLM parse was produced (API failure or no JSON).
+
+    Raised instead of returning the keyword fallback so the parse LRU
+    never memoizes a degraded result — one transient failure must not
+    pin the parameterless fallback for the rest of the process.
+    parse_intent re-raises it with .fallback set to the keyword parse,
+    so callers can still answer the turn without caching it in their
+    own layers either.
+    """
+
+    def __init__(self, detail: str = "", fallback: Optional[Dict[str, Any]] = None):
+        super().__init__(detail)
+        self.fallback = fallback
+
+
+_RESPONSE_SYSTEM_PROMPT = """You are a friendly AWS assistant. Answer questions conversationally.
+
+IMPORTANT: Keep responses SHORT (1-2 sentences max). Be concise and friendly.
+
+If asked about AWS/cloud services: Give a brief 1-sentence explanation, then say "I can help you manage EC2 instances and S3 buckets!"
+
+If greeted: Respond warmly in 1 sentence and ask what they'd like to do.
+
+Examples:
+- "what is aws" → "AWS is Amazon's cloud platform for computing, storage, and more. I can help you manage EC2 instances and S3 buckets!"
+- "how are you" → "I'm doing great! What would you like to do with your AWS resources today?"
+- "what is ec2" → "EC2 provides virtual servers in the cloud. Want me to list your instances or create a new one?"
+
+Keep it SHORT and actionable!"""
+
+
+class FastPerplexityClient:
+    """Optimized Perplexity client for low latency"""
+    
+    def __init__(self, api_key: Optional[str] = None):
+        self.api_key = api_key or os.getenv('PERPLEXITY_API_KEY')
+        self.base_url = "https://api.perplexity.ai/chat/completions"
+        self.model = "sonar"  # Fastest model
+
+        # Pooled session: reuses TCP/TLS connections across calls instead of
+        # a fresh handshake per request
+        self._http = requests.Session()
+        self._http.mount('https://', HTTPAdapter(
+            pool_connections=10,
+            pool_maxsize=50,
+            max_retries=Retry(total=2, backoff_factor=0.1)
+        ))
+
+        # Shared aiohttp session for the async entry points, created lazily
+        # on first use so construction works without a running loop
+        self._aio_session: Optional[aiohttp.ClientSession] = None
+
+        # Micro-batching machinery, also created lazily on first async use
+        self._batch_queue: Optional[asyncio.Queue] = None
+        self._batch_task: Optional[asyncio.Task] = None
+
+        # Per-instance LRU over the serialized parse result: temperature is
+        # 0.0 so output depends only on the (normalized) input. Only real
+        # LLM parses land here — failed calls raise ParseUnavailable,
+        # which lru_cache does not memoize, so they retry next turn
+        self._cached_parse = lru_cache(maxsize=1024)(self._parse_normalized)
+
+        if self.api_key:
+            print(f"[Perplexity] ✅ Initialized with API key: {self.api_key[:10]}...")
+            print(f"[Perplexity] ⚡ LRU cache enabled - repeat queries skip the LLM")
+        else:
+            print("[Perplexity] ❌ WARNING: No API key found! Using fallback parsing.")
+
+    def parse_intent(self, user_input: str) -> Dict[str, Any]:
+        """Parse intent, serving repeat queries from the LRU cache.
+
+        Raises ParseUnavailable (with .fallback populated) when the API
+        was reachable in principle but produced no parse, so callers can
+        tell a degraded keyword parse from a real one and avoid caching
+        it. Without an API key the keyword parser is authoritative and
+        is returned normally.
+        """
+
+        # If no API key, use fast fallback
+        if not self.api_key:
+            logger.warning("[Perplexity] No API key - using fallback")
+            return self._fast_fallback(user_input)
+
+        # Normalize so "List Instances" and "list instances" share an entry;
+        # round-trip through JSON so callers get a fresh mutable dict
+        try:
+            return json.loads(self._cached_parse(user_input.strip().lower()))
+        except ParseUnavailable:
+            logger.warning("[Perplexity] Falling back to keyword matching")
+            raise ParseUnavailable(
+                user_input, fallback=self._fast_fallback(user_input)
+            ) from None
+
+    def _parse_normalized(self, normalized_input: str) -> str:
+        """LLM parse of a normalized input, serialized for cache storage"""
+        logger.debug("[Perplexity] Calling LLM to parse: '%s'", normalized_input)
+        return json.dumps(self._call_api_sync(normalized_input))
+    
+    async def aparse_intent(self, user_input: str) -> Dict[str, Any]:
+        """Async variant of parse_intent — N concurrent parses cost max(RTT), not the sum.
+
+        Requests are funneled through a micro-batching window: parses that
+        arrive within ~80ms of each other share one API call and one
+        prompt prefill instead of N.
+        """
+        if not self.api_key:
+            return self._fast_fallback(user_input)
+
+        if self._batch_queue is None:
+            self._batch_queue = asyncio.Queue()
+        if self._batch_task is None or self._batch_task.done():
+            self._batch_task = asyncio.create_task(self._batch_worker())
+
+        future: asyncio.Future = asyncio.get_running_loop().create_future()
+        await self._batch_queue.put((user_input, future))
+        return await future
+
+    async def _batch_worker(self):
+        """Drain the batch queue: up to _BATCH_MAX items or _BATCH_WINDOW, whichever first"""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._batch_queue.get()]
+            deadline = loop.time() + _BATCH_WINDOW
+            while len(batch) < _BATCH_MAX:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._batch_queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            # The worker must outlive any failure — callers are parked on
+            # these futures, so resolve them via fallback rather than die
+            try:
+                if len(batch) == 1:
+                    user_input, future = batch[0]
+                    result = await self._call_api_async(user_input)
+                    if not future.done():
+                        future.set_result(result)
+                else:
+                    await self._parse_batch(batch)
+            except Exception:
+                logger.exception("[Perplexity] Batch worker error")
+                for user_input, future in batch:
+                    if not future.done():
+                        future.set_result(self._fast_fallback(user_input))
+
+    async def _parse_batch(self, batch) -> None:
+        """One API call for the whole batch; each caller gets its own slot back"""
+        inputs = [user_input for user_input, _ in batch]
+        results: Optional[List[Dict[str, Any]]] = None
         try:
-            response = requests.post(
+            session = await self._get_aio_session()
+            async with session.post(
                 self.base_url,
                 headers={
                     "Authorization": f"Bearer {self.api_key}",
                     "Content-Type": "application/json"
                 },
-                json={
-                    "model": self.model,
-                    "messages": [
-                        {"role": "system", "content": system_prompt},
-                        {"role": "user", "content": user_input}
-                    ],
-                    "temperature": 0.0,
-                    "max_tokens": 150,
+                json=self._build_batch_payload(inputs),
+                timeout=aiohttp.ClientTimeout(total=10)
+            ) as response:
+                if response.status == 200:
+                    data = _json_loads(await response.read())
+                    content = data['choices'][0]['message']['content']
+                    array_match = _JSON_ARRAY_RE.search(content)
+                    if array_match:
+                        parsed = _json_loads(array_match.group())
+                        if isinstance(parsed, list) and len(parsed) == len(inputs):
+                            results = parsed
+        except Exception:
+            logger.exception("[Perplexity] Exception during batched API call")
+
+        for index, (user_input, future) in enumerate(batch):
+            if future.done():
+                continue
+            if results is not None and isinstance(results[index], dict):
+                future.set_result(results[index])
+            else:
+                future.set_result(self._fast_fallback(user_input))
+
+    def _build_batch_payload(self, inputs: List[str]) -> Dict[str, Any]:
+        """Request payload parsing N commands in one completion"""
+        numbered = "\n".join(f"{i + 1}) {text}" for i, text in enumerate(inputs))
+        payload = self._build_parse_payload(numbered)
+        payload["messages"][0]["content"] += (
+            "\n\nYou will receive several commands as a numbered list. "
+            "Return ONLY a JSON array with exactly one object per command, in input order."
+        )
+        payload["max_tokens"] = 80 * len(inputs)
+        return payload
+
+    async def _get_aio_session(self) -> aiohttp.ClientSession:
+        if self._aio_session is None or self._aio_session.closed:
+            self._aio_session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=50, keepalive_timeout=60)
+            )
+        return self._aio_session
+
+    async def _call_api_async(self, user_input: str) -> Dict[str, Any]:
+        """Async API call sharing one keep-alive aiohttp session"""
+        try:
+            session = await self._get_aio_session()
+            async with session.post(
+                self.base_url,
+                headers={
+                    "Authorization": f"Bearer {self.api_key}",
+                    "Content-Type": "application/json"
+                },
+                json=self._build_parse_payload(user_input),
+                timeout=aiohttp.ClientTimeout(total=10)
+            ) as response:
+                if response.status == 200:
+                    data = _json_loads(await response.read())
+                    content = data['choices'][0]['message']['content']
+                    return self._parse_llm_content(content)
+        except ParseUnavailable:
+            pass  # warning already logged; nothing is cached on this path
+        except Exception:
+            logger.exception("[Perplexity] Exception during async API call")
+
+        return self._fast_fallback(user_input)
+
+    async def aclose(self):
+        """Close the shared aiohttp session and stop the batch worker"""
+        if self._batch_task is not None and not self._batch_task.done():
+            self._batch_task.cancel()
+        if self._aio_session and not self._aio_session.closed:
+            await self._aio_session.close()
+
+    def _build_parse_payload(self, user_input: str) -> Dict[str, Any]:
+        """Request payload for intent parsing (shared by sync and async paths)"""
+        return {
+            "model": self.model,
+            "messages": [
+                {"role": "system", "content": _PARSE_SYSTEM_PROMPT},
+                {"role": "user", "content": user_input}
+            ],
+            "temperature": 0.0,
+            "max_tokens": 80,  # Expected JSON is ~60 tokens; a tight cap trims TTFT
+        }
+
+    def _parse_llm_content(self, content: str) -> Dict[str, Any]:
+        """Extract the intent JSON from LLM output (shared by sync and async paths).
+
+        Raises ParseUnavailable when no JSON can be extracted, so callers
+        decide whether to fall back (and never cache the degraded result).
+        """
+        logger.debug("[Perplexity] LLM Response: %.200s...", content)
+
+        # The model almost always returns bare JSON, so try a direct parse
+        # first and only fall back to the regex extraction on failure
+        parsed = None
+        stripped = content.strip()
+        if stripped.startswith('{'):
+            try:
+                parsed = _json_loads(stripped)
+            except (ValueError, TypeError):
+                parsed = None
+
+        if parsed is None:
+            json_match = _JSON_RE.search(content)
+            if json_match:
+                parsed = _json_loads(json_match.group())
+
+        if parsed is not None:
+            logger.debug("[Perplexity] Parsed JSON: %s", parsed)
+
+            # Fix unknown action - default to greeting for conversational queries
+            if parsed.get('action') == 'unknown':
+                parsed['action'] = 'greeting'
+
+            return parsed
+
+        logger.warning("[Perplexity] No JSON found in LLM response")
+        raise ParseUnavailable(content)
+
+    def _call_api_sync(self, user_input: str) -> Dict[str, Any]:
+        """Synchronous API call; raises ParseUnavailable if no LLM parse was obtained"""
+        logger.debug("[Perplexity] Making API request to Perplexity...")
+
+        try:
+            response = self._http.post(
+                self.base_url,
+                headers={
+                    "Authorization": f"Bearer {self.api_key}",
+                    "Content-Type": "application/json"
                 },
+                json=self._build_parse_payload(user_input),
                 timeout=10
             )
-            
-            print(f"[Perplexity] 📥 API Response Status: {response.status_code}")
-            
+
+            logger.debug("[Perplexity] API Response Status: %s", response.status_code)
+
             if response.status_code == 200:
-                content = response.json()['choices'][0]['message']['content']
-                print(f"[Perplexity] 📄 LLM Response: {content[:200]}...")
-                
-                json_match = re.search(r'\{.*\}', content, re.DOTALL)
-                if json_match:
-                    parsed = json.loads(json_match.group())
-                    print(f"[Perplexity] ✅ Parsed JSON: {parsed}")
-                    
-                    # Fix unknown action - default to greeting for conversational queries
-                    if parsed.get('action') == 'unknown':
-                        parsed['action'] = 'greeting'
-                    
-                    return parsed
-                else:
-                    print(f"[Perplexity] ❌ No JSON found in LLM response")
+                content = _json_loads(response.content)['choices'][0]['message']['content']
+                return self._parse_llm_content(content)
             else:
-                print(f"[Perplexity] ❌ API Error: {response.text[:200]}")
-        
-        except Exception as e:
-            print(f"[Perplexity] ❌ Exception during API call: {type(e).__name__}: {e}")
-            import traceback
-            traceback.print_exc()
-        
-        print(f"[Perplexity] ⚠️  Falling back to keyword matching")
-        return self._fast_fallback(user_input)
+                logger.warning("[Perplexity] API Error: %.200s", response.text)
+
+        except ParseUnavailable:
+            raise
+        except Exception:
+            logger.exception("[Perplexity] Exception during API call")
+
+        raise ParseUnavailable(user_input)
     
     def _fast_fallback(self, user_input: str) -> Dict[str, Any]:
-        """Ultra-fast keyword-based fallback"""
+        """Ultra-fast keyword-based fallback (single scan over the input)"""
         text = user_input.lower()
-        
+
+        has_ec2 = has_s3 = False
+        actions = set()
+        for match in _FALLBACK_RE.finditer(text):
+            group = match.lastgroup
+            if group == 'ec2':
+                has_ec2 = True
+            elif group == 's3':
+                has_s3 = True
+            else:
+                actions.add(match.group('act'))
+
         # EC2 operations
-        if 'ec2' in text or 'instance' in text:
-            if 'create' in text or 'launch' in text:
+        if has_ec2:
+            if 'create' in actions or 'launch' in actions:
                 return {'service': 'ec2', 'action': 'create_instance', 'parameters': {}}
-            elif 'list' in text or 'show' in text:
+            elif 'list' in actions or 'show' in actions:
                 return {'service': 'ec2', 'action': 'list_instances', 'parameters': {}}
-            elif 'stop' in text:
+            elif 'stop' in actions:
                 return {'service': 'ec2', 'action': 'stop_instance', 'parameters': {}}
-            elif 'terminate' in text or 'delete' in text:
+            elif 'terminate' in actions or 'delete' in actions:
                 return {'service': 'ec2', 'action': 'terminate_instance', 'parameters': {}}
-        
+
         # S3 operations
-        if 's3' in text or 'bucket' in text:
-            if 'create' in text:
+        if has_s3:
+            if 'create' in actions:
                 return {'service': 's3', 'action': 'create_bucket', 'parameters': {}}
-            elif 'list' in text:
+            elif 'list' in actions:
                 return {'service': 's3', 'action': 'list_buckets', 'parameters': {}}
-            elif 'delete' in text:
+            elif 'delete' in actions:
                 return {'service': 's3', 'action': 'delete_bucket', 'parameters': {}}
-        
+
         # Greetings and conversational
-        greetings = ['hi', 'hello', 'hey', 'how are you', 'how are u', 'whats up', "what's up"]
-        if any(g in text for g in greetings):
+        if _GREETING_TOKENS.intersection(_TOKEN_RE.split(text)):
             return {'service': 'unknown', 'action': 'greeting', 'parameters': {}}
-        
-        if 'help' in text:
-            return {'service': 'unknown', 'action': 'help', 'parameters': {}}
-        
+
         return {'service': 'unknown', 'action': 'help', 'parameters': {}}
     
+    def _build_response_payload(self, user_input: str) -> Dict[str, Any]:
+        """Request payload for conversational responses (shared by sync and async paths)"""
+        return {
+            "model": self.model,
+            "messages": [
+                {"role": "system", "content": _RESPONSE_SYSTEM_PROMPT},
+                {"role": "user", "content": user_input}
+            ],
+            "temperature": 0.7,
+            "max_tokens": 80,  # Shorter responses
+        }
+
     def get_smart_response(self, user_input: str, context: str = "") -> str:
         """Generate conversational response using LLM"""
-        
+
         # If no API key, use fallback
         if not self.api_key:
             return self._get_fallback_response(user_input)
-        
-        print(f"[Perplexity] 💬 Generating conversational response for: '{user_input}'")
-        
-        try:
-            import requests
-            
-            system_prompt = """You are a friendly AWS assistant. Answer questions conversationally.
-
-IMPORTANT: Keep responses SHORT (1-2 sentences max). Be concise and friendly.
 
-If asked about AWS/cloud services: Give a brief 1-sentence explanation, then say "I can help you manage EC2 instances and S3 buckets!"
+        logger.debug("[Perplexity] Generating conversational response for: '%s'", user_input)
 
-If greeted: Respond warmly in 1 sentence and ask what they'd like to do.
-
-Examples:
-- "what is aws" → "AWS is Amazon's cloud platform for computing, storage, and more. I can help you manage EC2 instances and S3 buckets!"
-- "how are you" → "I'm doing great! What would you like to do with your AWS resources today?"
-- "what is ec2" → "EC2 provides virtual servers in the cloud. Want me to list your instances or create a new one?"
-
-Keep it SHORT and actionable!"""
-            
-            response = requests.post(
+        try:
+            response = self._http.post(
                 self.base_url,
                 headers={
                     "Authorization": f"Bearer {self.api_key}",
                     "Content-Type": "application/json"
                 },
-                json={
-                    "model": self.model,
-                    "messages": [
-                        {"role": "system", "content": system_prompt},
-                        {"role": "user", "content": user_input}
-                    ],
-                    "temperature": 0.7,
-                    "max_tokens": 80,  # Shorter responses
-                },
+                json=self._build_response_payload(user_input),
                 timeout=10
             )
-            
+
             if response.status_code == 200:
-                content = response.json()['choices'][0]['message']['content']
-                print(f"[Perplexity] ✅ Generated response: {content[:100]}...")
+                content = _json_loads(response.content)['choices'][0]['message']['content']
+                logger.debug("[Perplexity] Generated response: %.100s...", content)
                 return content
-        
-        except Exception as e:
-            print(f"[Perplexity] ❌ Error generating response: {e}")
-        
+
+        except Exception:
+            logger.exception("[Perplexity] Error generating response")
+
+        return self._get_fallback_response(user_input)
+
+    async def aget_smart_response(self, user_input: str, context: str = "") -> str:
+        """Async variant of get_smart_response sharing the aiohttp session"""
+        if not self.api_key:
+            return self._get_fallback_response(user_input)
+
+        try:
+            session = await self._get_aio_session()
+            async with session.post(
+                self.base_url,
+                headers={
+                    "Authorization": f"Bearer {self.api_key}",
+                    "Content-Type": "application/json"
+                },
+                json=self._build_response_payload(user_input),
+                timeout=aiohttp.ClientTimeout(total=10)
+            ) as response:
+                if response.status == 200:
+                    data = _json_loads(await response.read())
+                    return data['choices'][0]['message']['content']
+        except Exception:
+            logger.exception("[Perplexity] Error generating async response")
+
         return self._get_fallback_response(user_input)
     
     def _get_fallback_response(self, user_input: str) -> str:
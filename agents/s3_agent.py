@@ -1,13 +1,27 @@
+import array
+import time
+
 import boto3
+from botocore.exceptions import ClientError
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Any, List
 from agents.base_agent import BaseAgent, Message
 
+# Listings change rarely but get polled constantly by the dashboard;
+# memoize them briefly instead of re-hitting S3 and rebuilding N dicts
+_LIST_CACHE_TTL = 30  # seconds
+
+# Existence pre-checks repeat quickly around create/delete flows
+_EXISTS_CACHE_TTL = 10  # seconds
+
+
 class S3Agent(BaseAgent):
     """Agent specialized in S3 bucket operations with A2A capabilities"""
-    
+
     def __init__(self):
         super().__init__("S3Agent")
         self.s3 = boto3.client('s3')
+        # cache key -> (timestamp, result); holds recent listing responses
         self.bucket_cache = {}
     
     def handle_message(self, message: Message) -> Any:
@@ -37,12 +51,26 @@ class S3Agent(BaseAgent):
         return super().handle_message(message)
     
     def _bucket_exists(self, bucket_name: str) -> Dict[str, Any]:
-        """Check if a bucket exists"""
+        """Check if a bucket exists (memoized briefly)"""
+        now = time.monotonic()
+        cache_key = f"exists:{bucket_name}"
+        cached = self.bucket_cache.get(cache_key)
+        if cached and now - cached[0] < _EXISTS_CACHE_TTL:
+            return cached[1]
+
         try:
             self.s3.head_bucket(Bucket=bucket_name)
-            return {"exists": True, "bucket_name": bucket_name}
-        except:
-            return {"exists": False, "bucket_name": bucket_name}
+            result = {"exists": True, "bucket_name": bucket_name}
+        except ClientError as e:
+            # Only a definite "not there" means False; permission and
+            # transport errors propagate instead of masquerading as absence
+            code = e.response.get("Error", {}).get("Code")
+            if code not in ("404", "NoSuchBucket", "NotFound"):
+                raise
+            result = {"exists": False, "bucket_name": bucket_name}
+
+        self.bucket_cache[cache_key] = (now, result)
+        return result
     
     def create_bucket(self, bucket_name: str, region: str = None) -> Dict[str, Any]:
         """Create an S3 bucket"""
@@ -60,6 +88,9 @@ class S3Agent(BaseAgent):
                     CreateBucketConfiguration={'LocationConstraint': region}
                 )
             
+            # The bucket list just changed — drop the memoized entries
+            self.bucket_cache.pop("_all", None)
+            self.bucket_cache.pop(f"exists:{bucket_name}", None)
             return {
                 "success": True,
                 "bucket_name": bucket_name,
@@ -70,17 +101,24 @@ class S3Agent(BaseAgent):
             return {"error": str(e)}
     
     def list_buckets(self) -> Dict[str, Any]:
-        """List all S3 buckets"""
+        """List all S3 buckets (memoized for a short TTL)"""
+        now = time.monotonic()
+        cached = self.bucket_cache.get("_all")
+        if cached and now - cached[0] < _LIST_CACHE_TTL:
+            return cached[1]
+
         try:
             response = self.s3.list_buckets()
             buckets = [
                 {
                     'name': bucket['Name'],
-                    'creation_date': str(bucket['CreationDate'])
+                    'creation_date': bucket['CreationDate'].isoformat()
                 }
                 for bucket in response['Buckets']
             ]
-            return {"success": True, "buckets": buckets}
+            result = {"success": True, "buckets": buckets}
+            self.bucket_cache["_all"] = (now, result)
+            return result
         except Exception as e:
             return {"error": str(e)}
     
@@ -88,13 +126,25 @@ class S3Agent(BaseAgent):
         """Delete an S3 bucket"""
         try:
             if force:
-                # Delete all objects first
-                response = self.s3.list_objects_v2(Bucket=bucket_name)
-                if 'Contents' in response:
-                    for obj in response['Contents']:
-                        self.s3.delete_object(Bucket=bucket_name, Key=obj['Key'])
+                # Delete all objects first: the bulk API takes 1000 keys
+                # per call instead of one round-trip per object, and
+                # independent pages are deleted in parallel
+                paginator = self.s3.get_paginator('list_objects_v2')
+                with ThreadPoolExecutor(max_workers=8) as executor:
+                    for page in paginator.paginate(Bucket=bucket_name):
+                        objects = [{'Key': obj['Key']} for obj in page.get('Contents', [])]
+                        if objects:
+                            executor.submit(
+                                self.s3.delete_objects,
+                                Bucket=bucket_name,
+                                Delete={'Objects': objects, 'Quiet': True}
+                            )
             
             self.s3.delete_bucket(Bucket=bucket_name)
+            # Drop memoized entries that mention the deleted bucket
+            self.bucket_cache.pop("_all", None)
+            self.bucket_cache.pop(f"objects:{bucket_name}", None)
+            self.bucket_cache.pop(f"exists:{bucket_name}", None)
             return {
                 "success": True,
                 "bucket_name": bucket_name,
@@ -120,19 +170,37 @@ class S3Agent(BaseAgent):
             return {"error": str(e)}
     
     def list_objects(self, bucket_name: str) -> Dict[str, Any]:
-        """List objects in an S3 bucket"""
+        """List objects in an S3 bucket (memoized for a short TTL)"""
+        now = time.monotonic()
+        cache_key = f"objects:{bucket_name}"
+        cached = self.bucket_cache.get(cache_key)
+        if cached and now - cached[0] < _LIST_CACHE_TTL:
+            return cached[1]
+
         try:
-            response = self.s3.list_objects_v2(Bucket=bucket_name)
-            objects = []
-            if 'Contents' in response:
-                objects = [
-                    {
-                        'key': obj['Key'],
-                        'size': obj['Size'],
-                        'last_modified': str(obj['LastModified'])
-                    }
-                    for obj in response['Contents']
-                ]
-            return {"success": True, "bucket_name": bucket_name, "objects": objects}
+            # Paginate (one list_objects_v2 call caps at 1000 keys) and
+            # build columnar results: three parallel columns are far
+            # lighter than a dict per object, with sizes packed into a
+            # machine-int array while accumulating
+            paginator = self.s3.get_paginator('list_objects_v2')
+            keys: List[str] = []
+            sizes = array.array('q')
+            last_modified: List[str] = []
+            for page in paginator.paginate(Bucket=bucket_name,
+                                           PaginationConfig={'PageSize': 1000}):
+                contents = page.get('Contents', ())
+                keys.extend(obj['Key'] for obj in contents)
+                sizes.extend(obj['Size'] for obj in contents)
+                last_modified.extend(obj['LastModified'].isoformat() for obj in contents)
+
+            result = {
+                "success": True,
+                "bucket_name": bucket_name,
+                "keys": keys,
+                "sizes": list(sizes),
+                "last_modified": last_modified
+            }
+            self.bucket_cache[cache_key] = (now, result)
+            return result
         except Exception as e:
             return {"error": str(e)}
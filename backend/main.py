@@ -1,23 +1,75 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI, HTTPException
-from fastapi.middleware.cors import CORSMiddleware
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel
 from typing import Optional
 import sys
 sys.path.append('..')
 from agents.coordinator import CoordinatorAgent
 
-app = FastAPI(title="AWS Multi-Agent System")
+try:
+    # Rust JSON codec for response serialization; stdlib encoder otherwise
+    import orjson  # noqa: F401  (ORJSONResponse needs it at runtime)
+    from fastapi.responses import ORJSONResponse as _DefaultResponse
+except ImportError:
+    from fastapi.responses import JSONResponse as _DefaultResponse
+
+coordinator: Optional[CoordinatorAgent] = None
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Build the agent network at startup instead of at import time: the
+    # module stays importable without AWS reachability (tooling, tests),
+    # and construction runs off the loop since it sets up boto3 clients
+    global coordinator
+    coordinator = await run_in_threadpool(CoordinatorAgent)
+    yield
+
+
+app = FastAPI(title="AWS Multi-Agent System", lifespan=lifespan,
+              default_response_class=_DefaultResponse)
+
+
+class FastCORS:
+    """Allow-everything CORS for development, without per-request matching.
+
+    The config is maximally permissive (all origins incl. file://, no
+    credentials), so the answer never depends on the request — three
+    fixed header bytes replace Starlette's origin matching on every call.
+    """
 
-# CORS middleware - allow all origins for development
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],  # Allow all origins including file:// protocol
-    allow_credentials=False,  # Must be False when allow_origins is "*"
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
+    _HEADERS = (
+        (b"access-control-allow-origin", b"*"),
+        (b"access-control-allow-methods", b"*"),
+        (b"access-control-allow-headers", b"*"),
+    )
 
-coordinator = CoordinatorAgent()
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        if scope["method"] == "OPTIONS":
+            # Preflight: answer directly, the app never sees it
+            await send({"type": "http.response.start", "status": 204,
+                        "headers": list(self._HEADERS)})
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        async def send_with_cors(event):
+            if event["type"] == "http.response.start":
+                event["headers"] = list(event.get("headers") or ()) + list(self._HEADERS)
+            await send(event)
+
+        await self.app(scope, receive, send_with_cors)
+
+
+app.add_middleware(FastCORS)
 
 class ChatRequest(BaseModel):
     message: str
@@ -34,7 +86,10 @@ async def root():
 async def chat(request: ChatRequest):
     """Process chat message and return agent response"""
     try:
-        response = coordinator.process_request(request.message)
+        # The agent pipeline is synchronous (requests + boto3); run it in
+        # the threadpool so one slow LLM/AWS call can't stall every other
+        # request on the event loop
+        response = await run_in_threadpool(coordinator.process_request, request.message)
         return ChatResponse(
             response=response,
             success="error" not in response
@@ -45,19 +100,20 @@ async def chat(request: ChatRequest):
 @app.get("/instances")
 async def list_instances():
     """List all EC2 instances"""
-    return coordinator.ec2_agent.list_instances()
+    return await run_in_threadpool(coordinator.ec2_agent.list_instances)
 
 @app.get("/buckets")
 async def list_buckets():
     """List all S3 buckets"""
-    return coordinator.s3_agent.list_buckets()
+    return await run_in_threadpool(coordinator.s3_agent.list_buckets)
 
 @app.get("/status")
 async def get_status():
     """Get system status with A2A communication demo"""
-    # Use A2A to gather info from all agents
-    ec2_info = coordinator.query_agent("EC2Agent", "How many running instances?")
-    s3_info = coordinator.query_agent("S3Agent", "How many buckets?")
+    # Use A2A to gather info from all agents (off the event loop: both
+    # queries hit AWS through sync boto3)
+    ec2_info = await run_in_threadpool(coordinator.query_agent, "EC2Agent", "How many running instances?")
+    s3_info = await run_in_threadpool(coordinator.query_agent, "S3Agent", "How many buckets?")
     
     # Check LLM client type
     llm_client_type = type(coordinator.perplexity).__name__
@@ -77,9 +133,19 @@ async def get_status():
             "ec2": ec2_info,
             "s3": s3_info
         },
-        "conversation_history": coordinator.get_conversation_history()[-5:]  # Last 5 messages
+        "conversation_history": coordinator.get_recent_history(5)  # Last 5 messages
     }
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+
+    # Prefer the C event loop and HTTP parser when present — both are
+    # drop-ins worth roughly 2x req/s over asyncio's selector loop + h11
+    try:
+        import httptools  # noqa: F401
+        import uvloop  # noqa: F401
+        loop_impl, http_impl = "uvloop", "httptools"
+    except ImportError:
+        loop_impl, http_impl = "auto", "auto"
+
+    uvicorn.run(app, host="0.0.0.0", port=8000, loop=loop_impl, http=http_impl)